@@ -2,16 +2,213 @@
 # -*- coding: utf-8 -*-
 
 import bibtexparser
-from bibtexparser.bparser import BibTexParser
-from bibtexparser.bwriter import BibTexWriter
-from bibtexparser.bibdatabase import BibDatabase
 import csv
+import functools
+import mmap
 import os
 import logging
 import re # Importar regex para tratamento mais robusto do DOI
+from concurrent.futures import ProcessPoolExecutor
+
+# bibtexparser v2 usa um parser de passada única, ordens de magnitude mais
+# rápido que a gramática pyparsing da v1. Detectamos a versão instalada e
+# usamos a API correspondente em _load_bib.
+_HAS_BP2 = hasattr(bibtexparser, 'parse_file')
+if not _HAS_BP2:
+    from bibtexparser.bparser import BibTexParser
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Logger de módulo: dispensa o despacho extra do logger raiz a cada chamada
+logger = logging.getLogger(__name__)
+
+# RE2 (pip install google-re2) executa o match como DFA em tempo linear
+# garantido, sem o backtracking do motor re do Python — relevante para campos
+# doi poluídos com URLs. Opcional: caímos para o re padrão se não instalado.
+try:
+    import re2 as _re_engine
+except ImportError:
+    _re_engine = re
+
+# pandas serializa e escapa CSV em código C, bem mais rápido que o
+# csv.DictWriter puro-Python para corpora grandes. Opcional, com fallback.
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+# Filtro de Bloom (pip install pybloom-live) para conjuntos Y muito grandes:
+# responde os negativos (caso comum) tocando poucos bits em cache, em vez de
+# consultar o conjunto completo de strings. Opcional.
+try:
+    from pybloom_live import BloomFilter
+except ImportError:
+    BloomFilter = None
+
+# Abaixo deste tamanho o conjunto exato cabe em cache e o filtro não compensa
+_BLOOM_MIN_DOIS = 10000
+
+# xxhash (opcional): guardar digests xxh64 de 64 bits no conjunto de DOIs em
+# vez das strings (~28 B por entrada contra 100+ B) encolhe o working set
+# para caber em L2/L3, e o teste de pertencimento vira comparação de inteiros.
+try:
+    import xxhash
+
+    def _doi_key(doi):
+        return xxhash.xxh64_intdigest(doi.encode('utf-8'))
+except ImportError:
+    xxhash = None
+    _doi_key = str # Sem xxhash, a chave é a própria string do DOI
+
+# Caracteres válidos de DOI (a mesma classe da regex abaixo): usado para
+# checar em O(1) o último caractere no caminho rápido de normalize_doi.
+_DOI_CHARS = frozenset('-._;()/:abcdefghijklmnopqrstuvwxyz0123456789')
+
+# Regex de DOI pré-compilada em escopo de módulo: evita o lookup no cache do
+# módulo re a cada chamada de normalize_doi. A entrada já é convertida para
+# minúsculas antes do match, então a classe de caracteres pode ser minúscula
+# e dispensamos re.IGNORECASE (menos trabalho de case-folding por caractere).
+_DOI_RE = _re_engine.compile(r'(10\.\d{4,9}/[-._;()/:a-z0-9]+)')
+
+# Regex byte a byte para varrer campos "doi = {...}" direto do arquivo, sem
+# parsear o BibTeX. Captura qualquer valor não vazio — não só DOIs estritos
+# "10.x/..." — porque normalize_doi devolve strings fora do padrão como estão
+# (ex: "internal-id-42") e esses valores de fallback também deduplicam no
+# caminho com parser completo. Usada quando só o conjunto de DOIs interessa.
+_DOI_FIELD_RE = re.compile(rb'(?im)^\s*doi\s*=\s*[{"]?[ \t]*([^{}"\r\n]+)')
+
+# Blocos @comment/@preamble não viram entradas: removê-los dos bytes antes do
+# parse encolhe a entrada e a superfície da gramática pyparsing da v1.
+_SKIP_BLOCK_RE = re.compile(rb'@(?:comment|preamble)\s*\{[^}]*\}', re.IGNORECASE)
+
+# Tabela para colapsar quebras de linha/tabs em espaços numa única passada C
+# (str.translate), sem as alocações intermediárias de splitlines() + join().
+_NL_TABLE = str.maketrans({'\n': ' ', '\r': ' ', '\t': ' '})
+
+# Campos essenciais garantidos em toda entrada padronizada, e o template de
+# entrada vazia pré-construído: um único merge de dicts por entrada em vez de
+# três passadas sobre a lista de campos.
+_ESSENTIAL_FIELDS = ('doi', 'title', 'abstract', 'keywords', 'author', 'year',
+                     'publisher', 'journal', 'booktitle', 'pages', 'volume', 'number')
+_EMPTY_TEMPLATE = dict.fromkeys(_ESSENTIAL_FIELDS, '')
+
+# Template constante de serialização: as entradas padronizadas têm sempre os
+# mesmos campos, então cada entrada vira um único format_map em vez do
+# caminho por campo (ordenar, indentar, concatenar) do BibTexWriter. Campos
+# em ordem alfabética e valores verbatim, o mesmo layout do writer da v1.
+_ENTRY_TEMPLATE = (
+    '@{ENTRYTYPE}{{{ID},\n'
+    + ',\n'.join('  %s = {{{%s}}}' % (f, f) for f in sorted(_ESSENTIAL_FIELDS))
+    + '\n}}\n'
+)
+
+# --- Função de Carregamento de BibTeX ---
+def _load_bib(file_path):
+    """
+    Lê um arquivo BibTeX e retorna a lista de entradas como dicionários no
+    formato v1 (campos da entrada mais as chaves 'ID' e 'ENTRYTYPE').
+    Usa a API rápida da bibtexparser v2 quando disponível.
+    """
+    if _HAS_BP2:
+        library = bibtexparser.parse_file(file_path, append_middleware=[])
+        entries = []
+        for entry in library.entries:
+            # Adaptar o modelo da v2 para o formato de dicionário da v1
+            entry_dict = {field.key: field.value for field in entry.fields}
+            entry_dict['ID'] = entry.key
+            entry_dict['ENTRYTYPE'] = entry.entry_type
+            entries.append(entry_dict)
+        return entries
+    # mmap deixa o SO paginar o arquivo sob demanda em vez de uma leitura
+    # Python intermediária; só o decode para str é pago antes do parser.
+    with open(file_path, 'rb') as bibtex_file:
+        if os.fstat(bibtex_file.fileno()).st_size == 0:
+            return [] # mmap não aceita arquivos vazios
+        with mmap.mmap(bibtex_file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            content = _SKIP_BLOCK_RE.sub(b'', mm).decode('utf-8')
+    # common_strings e interpolação continuam LIGADOS: desligá-los faz o
+    # parser devolver BibDataStringExpression para campos que referenciam
+    # abreviações @string, que o _write_bib serializaria como repr (corrupção
+    # silenciosa). O ganho mensurável está na remoção de @comment/@preamble
+    # acima, que encolhe a entrada da gramática pyparsing.
+    parser = BibTexParser(common_strings=True)
+    parser.ignore_nonstandard_types = False
+    parser.homogenize_fields = False # We handle homogenization
+    return bibtexparser.loads(content, parser=parser).entries
+
+# --- Função de Escrita de BibTeX ---
+def _write_bib(entries, output_path, presorted=False):
+    """
+    Serializa as entradas (dicts) para output_path de forma incremental, uma
+    entrada por vez, em vez de materializar a string completa do arquivo em
+    memória como writer.write(db) faz — corta o pico de memória pela metade
+    para bibliotecas grandes.
+
+    Com presorted=True aceita qualquer iterável (inclusive geradores) e
+    escreve na ordem recebida, sem materializar a sequência para ordenar.
+
+    Cada entrada é emitida com um único format_map contra _ENTRY_TEMPLATE —
+    um punhado de operações de formatação em C por entrada, sem o custo por
+    campo (ordenação, indentação, concatenação) do BibTexWriter.
+    """
+    with open(output_path, 'w', encoding='utf-8') as bibtex_outfile:
+        if presorted:
+            ordered = entries
+        else:
+            # Ordenação por ID (case-insensitive), como o BibTexWriter da v1
+            ordered = sorted(entries, key=lambda e: str(e.get('ID', '')).lower())
+        first = True
+        for entry in ordered:
+            if not first:
+                bibtex_outfile.write('\n')
+            first = False
+            # O merge com o template garante os campos essenciais mesmo para
+            # entradas vindas de arquivos não gerados por este script.
+            bibtex_outfile.write(_ENTRY_TEMPLATE.format_map({
+                **_EMPTY_TEMPLATE,
+                **entry,
+                'ENTRYTYPE': entry.get('ENTRYTYPE', '').lower(),
+            }))
+
+# --- Função de Varredura Rápida de DOIs ---
+def _scan_dois(file_path):
+    """
+    Extrai o conjunto de DOIs de um arquivo BibTeX varrendo os bytes brutos
+    com regex, sem construir o banco de entradas. Suficiente (e muito mais
+    barato que o parser completo) quando só o conjunto de DOIs é necessário.
+    Cada valor passa por normalize_doi, então o conjunto resultante tem a
+    mesma semântica do caminho com parser — inclusive DOIs de fallback fora
+    do padrão "10.x/...".
+
+    Premissa: um campo por linha, como nos arquivos gerados por este script
+    (a padronização colapsa quebras de linha dentro dos valores). Em arquivos
+    arbitrários com valores multi-linha, uma linha interna começando com
+    "doi = ..." seria capturada indevidamente.
+    """
+    # A regex roda direto sobre o mmap (zero cópia): o SO pagina o arquivo
+    # sob demanda e nenhum buffer intermediário é alocado.
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return set() # mmap não aceita arquivos vazios
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            dois = set()
+            for m in _DOI_FIELD_RE.finditer(mm):
+                # Aparar vírgula final de valores sem delimitador e normalizar
+                # como no caminho com parser completo
+                value = m.group(1).decode('utf-8', 'replace').rstrip().rstrip(',').rstrip()
+                if value:
+                    dois.add(normalize_doi(value))
+            return dois
+
+@functools.lru_cache(maxsize=8)
+def _load_dois(file_path, mtime):
+    """
+    Versão memoizada de _scan_dois, chaveada por (caminho, mtime): quando o
+    mesmo arquivo Y é comparado contra vários X (como o IEEE no fluxo de
+    exemplo), a varredura acontece uma única vez — e o mtime na chave evita
+    servir um conjunto velho se o arquivo for reescrito.
+    """
+    return _scan_dois(file_path)
 
 # --- Função de Normalização de DOI ---
 def normalize_doi(doi_string):
@@ -19,15 +216,29 @@ def normalize_doi(doi_string):
     if not doi_string:
         return ''
     doi_string = doi_string.strip().lower() # Normalize to lower case
+    # Caminho rápido: entradas já padronizadas (DOI puro "10.xxxx/...") são o
+    # caso comum em remove_duplicates_by_doi; evita invocar a regex. A checagem
+    # do último caractere barra sujeira no fim (ex: "10.1234/abc," ou
+    # "10.1234/abc}"), que deve cair na regex para ser aparada como antes.
+    if (doi_string.startswith('10.') and '/' in doi_string
+            and ' ' not in doi_string and doi_string[-1] in _DOI_CHARS):
+        return doi_string
+    # Caminho rápido para prefixos de URL (ex: https://doi.org/10.xxxx/...):
+    # fatiar a partir de "10." e validar com fullmatch, mais barato que search.
+    idx = doi_string.find('10.')
+    if idx > 0:
+        candidate = doi_string[idx:]
+        if _DOI_RE.fullmatch(candidate):
+            return candidate
     # Regex to find DOI: starts with 10., followed by numbers, then /, then characters
     # Handles optional URL prefixes like https://doi.org/
-    match = re.search(r'(10\.\d{4,9}/[-._;()/:A-Z0-9]+)', doi_string, re.IGNORECASE)
+    match = _DOI_RE.search(doi_string)
     if match:
         # Return the extracted DOI, already lowercased
         return match.group(1)
     # If no standard DOI pattern found, return the original cleaned string (lowercased) as fallback
     # Consider returning '' if only strict DOI format is desired.
-    logging.warning(f"DOI string '{doi_string}' did not match standard pattern. Returning as is (lowercased).")
+    logger.warning("DOI string '%s' did not match standard pattern. Returning as is (lowercased).", doi_string)
     return doi_string
 
 # --- Função de Padronização ---
@@ -35,97 +246,88 @@ def standardize_bibtex_file(input_path, output_path):
     """
     Lê um arquivo BibTeX, padroniza suas entradas (incluindo DOI) e salva em um novo arquivo.
     """
-    logging.info(f"Iniciando padronização do arquivo: {input_path}")
+    logger.info(f"Iniciando padronização do arquivo: {input_path}")
     try:
-        with open(input_path, 'r', encoding='utf-8') as bibtex_file:
-            # Use a custom parser to handle potential errors more gracefully if needed
-            parser = BibTexParser(common_strings=True)
-            parser.ignore_nonstandard_types = False
-            parser.homogenize_fields = False # We handle homogenization
-            # Add interpolation=False if encountering issues with % signs or similar
-            # parser.interpolation = False
-            bib_database = bibtexparser.load(bibtex_file, parser=parser)
+        entries = _load_bib(input_path)
     except FileNotFoundError:
-        logging.error(f"Erro: Arquivo de entrada não encontrado em {input_path}")
+        logger.error(f"Erro: Arquivo de entrada não encontrado em {input_path}")
         return
     except Exception as e:
-        logging.error(f"Erro ao ler o arquivo BibTeX {input_path}: {e}")
+        logger.error(f"Erro ao ler o arquivo BibTeX {input_path}: {e}")
         # Optionally re-raise or return an error indicator
         return
 
-    standardized_db = BibDatabase()
     standardized_entries = []
     processed_ids = set() # Keep track of processed entry IDs
 
-    for entry in bib_database.entries:
+    # O corpo do loop são operações de dict que praticamente nunca lançam,
+    # então o try fica FORA do for: evita armar o estado de exceção a cada
+    # iteração. Se algo lançar, logamos e retomamos o mesmo iterador na
+    # entrada seguinte — entradas problemáticas continuam sendo puladas.
+    entry_iter = iter(entries)
+    entry = None
+    while True:
         try:
-            original_id = entry.get('ID')
-            original_entrytype = entry.get('ENTRYTYPE')
-
-            if not original_id or not original_entrytype:
-                logging.warning(f"Entrada sem ID ou ENTRYTYPE encontrada, pulando: {entry}")
-                continue
-
-            # Avoid processing the same ID multiple times if duplicates exist in input
-            if original_id in processed_ids:
-                logging.warning(f"ID de entrada duplicado '{original_id}' encontrado no arquivo {input_path}. Pulando ocorrência adicional.")
-                continue
-            processed_ids.add(original_id)
-
-            # Padroniza campos para minúsculas, mas mantém ID e ENTRYTYPE originais
-            standardized_entry_data = {k.lower(): v for k, v in entry.items() if k not in ['ID', 'ENTRYTYPE']}
-
-            # --- Normalização do DOI ---
-            raw_doi = standardized_entry_data.get('doi', '')
-            standardized_entry_data['doi'] = normalize_doi(raw_doi) # Apply normalization
-
-            # Garantir campos essenciais e tratar journal/booktitle
-            essential_fields = ['doi', 'title', 'abstract', 'keywords', 'author', 'year', 'publisher', 'journal', 'booktitle', 'pages', 'volume', 'number']
-            for field in essential_fields:
-                if field not in standardized_entry_data:
-                    standardized_entry_data[field] = '' # Add empty field if missing
-
-            # Handle journal/booktitle consolidation
-            if not standardized_entry_data.get('journal') and standardized_entry_data.get('booktitle'):
-                standardized_entry_data['journal'] = standardized_entry_data['booktitle']
-                # Optionally clear booktitle if journal is now populated
-                # standardized_entry_data['booktitle'] = ''
-
-            # Recriar a entrada final com ID/ENTRYTYPE originais e campos padronizados
-            final_entry = {
-                'ID': original_id,
-                'ENTRYTYPE': original_entrytype
-            }
-            # Add only the essential fields we care about, ensuring order potentially
-            for field in essential_fields:
-                 final_entry[field] = standardized_entry_data.get(field, '')
-
-            # Add any other fields that were present and lowercased, if desired
-            # for key, value in standardized_entry_data.items():
-            #     if key not in essential_fields and key not in ['id', 'entrytype']: # Avoid adding again
-            #         final_entry[key] = value
-
-            standardized_entries.append(final_entry)
-
+            for entry in entry_iter:
+                original_id = entry.get('ID')
+                original_entrytype = entry.get('ENTRYTYPE')
+
+                if not original_id or not original_entrytype:
+                    logger.warning("Entrada sem ID ou ENTRYTYPE encontrada, pulando: %s", entry)
+                    continue
+
+                # Avoid processing the same ID multiple times if duplicates exist in input
+                if original_id in processed_ids:
+                    logger.warning("ID de entrada duplicado '%s' encontrado no arquivo %s. Pulando ocorrência adicional.", original_id, input_path)
+                    continue
+                processed_ids.add(original_id)
+
+                # Entrada final em uma única passada sobre os campos: o
+                # template já traz todos os campos essenciais vazios, e campos
+                # padronizados para minúsculas que não sejam essenciais são
+                # descartados como antes (ID e ENTRYTYPE originais são
+                # preservados).
+                final_entry = {
+                    'ID': original_id,
+                    'ENTRYTYPE': original_entrytype,
+                    **_EMPTY_TEMPLATE
+                }
+                for key, value in entry.items():
+                    # islower() é um fast-path em C: evita alocar uma nova
+                    # string quando a chave já está em minúsculas (o caso
+                    # comum na v1)
+                    lowered = key if key.islower() else key.lower()
+                    if lowered in _EMPTY_TEMPLATE:
+                        # Colapsar quebras de linha dentro do valor: garante
+                        # um campo por linha nos arquivos gerados — a premissa
+                        # da varredura byte a byte de _scan_dois — e evita que
+                        # um abstract multi-linha contendo "doi = ..." injete
+                        # DOIs fantasmas no conjunto Y.
+                        if isinstance(value, str) and ('\n' in value or '\r' in value):
+                            value = value.translate(_NL_TABLE).strip()
+                        final_entry[lowered] = value
+
+                # --- Normalização do DOI ---
+                final_entry['doi'] = normalize_doi(final_entry['doi']) # Apply normalization
+
+                # Handle journal/booktitle consolidation
+                if not final_entry['journal'] and final_entry['booktitle']:
+                    final_entry['journal'] = final_entry['booktitle']
+                    # Optionally clear booktitle if journal is now populated
+                    # final_entry['booktitle'] = ''
+
+                standardized_entries.append(final_entry)
+            break
         except Exception as e:
-            entry_id_for_log = entry.get('ID', 'Desconhecido')
-            logging.warning(f"Erro ao padronizar a entrada {entry_id_for_log} no arquivo {input_path}: {e}. Pulando entrada.")
+            entry_id_for_log = entry.get('ID', 'Desconhecido') if entry else 'Desconhecido'
+            logger.warning("Erro ao padronizar a entrada %s no arquivo %s: %s. Pulando entrada.", entry_id_for_log, input_path, e)
             # Consider logging the full entry details for debugging if needed
 
-    standardized_db.entries = standardized_entries
-
     try:
-        writer = BibTexWriter()
-        writer.indent = '  '     # Indentation for better readability
-        writer.comma_first = False # Comma at the end
-        # Ensure consistent field order if desired (optional)
-        # writer.order_entries_by = ('ENTRYTYPE', 'ID')
-        # writer.display_order = ('title', 'author', 'journal', 'year', ...) # Define explicit field order
-        with open(output_path, 'w', encoding='utf-8') as bibtex_outfile:
-            bibtex_outfile.write(writer.write(standardized_db))
-        logging.info(f"Arquivo BibTeX padronizado salvo em: {output_path}")
+        _write_bib(standardized_entries, output_path)
+        logger.info(f"Arquivo BibTeX padronizado salvo em: {output_path}")
     except Exception as e:
-        logging.error(f"Erro ao salvar o arquivo BibTeX padronizado {output_path}: {e}")
+        logger.error(f"Erro ao salvar o arquivo BibTeX padronizado {output_path}: {e}")
 
 
 # --- Função de Remoção de Duplicatas por DOI ---
@@ -133,93 +335,147 @@ def remove_duplicates_by_doi(file_x_path, file_y_path, output_path):
     """
     Remove entradas do arquivo X se o DOI (normalizado e em minúsculas) existir no arquivo Y.
     Assume que os arquivos de entrada já foram padronizados pela função standardize_bibtex_file.
+    file_y_path pode ser um caminho de arquivo ou um conjunto de DOIs já
+    construído (ex: via _load_dois), permitindo reutilizar o mesmo Y em
+    várias comparações sem varrer o arquivo de novo.
     """
-    logging.info(f"Iniciando remoção de duplicatas: {file_x_path} vs {file_y_path}")
+    y_label = "<conjunto de DOIs pré-construído>" if isinstance(file_y_path, (set, frozenset)) else file_y_path
+    logger.info(f"Iniciando remoção de duplicatas: {file_x_path} vs {y_label}")
 
     def load_bib(file_path):
         try:
-            with open(file_path, 'r', encoding='utf-8') as bibtex_file:
-                parser = BibTexParser(common_strings=True)
-                parser.ignore_nonstandard_types = False
-                parser.homogenize_fields = False # Already standardized
-                return bibtexparser.load(bibtex_file, parser=parser)
+            return _load_bib(file_path)
         except FileNotFoundError:
-            logging.error(f"Erro: Arquivo não encontrado em {file_path}")
+            logger.error(f"Erro: Arquivo não encontrado em {file_path}")
             return None
         except Exception as e:
-            logging.error(f"Erro ao ler o arquivo BibTeX {file_path}: {e}")
+            logger.error(f"Erro ao ler o arquivo BibTeX {file_path}: {e}")
             return None
 
-    db_x = load_bib(file_x_path)
-    db_y = load_bib(file_y_path)
+    entries_x = load_bib(file_x_path)
 
-    if db_x is None or db_y is None:
-        logging.error("Não foi possível carregar um ou ambos os arquivos BibTeX. Abortando remoção de duplicatas.")
+    # Do arquivo Y só precisamos do conjunto de DOIs (já normalizados pela
+    # padronização): a varredura byte a byte dispensa o parse completo, e a
+    # memoização por (caminho, mtime) evita repeti-la quando o mesmo Y é
+    # reutilizado.
+    if isinstance(file_y_path, (set, frozenset)):
+        dois_y = file_y_path
+    else:
+        try:
+            dois_y = _load_dois(file_y_path, os.path.getmtime(file_y_path))
+        except FileNotFoundError:
+            logger.error(f"Erro: Arquivo não encontrado em {file_y_path}")
+            dois_y = None
+        except Exception as e:
+            logger.error(f"Erro ao ler o arquivo BibTeX {file_y_path}: {e}")
+            dois_y = None
+
+    if entries_x is None or dois_y is None:
+        logger.error("Não foi possível carregar um ou ambos os arquivos BibTeX. Abortando remoção de duplicatas.")
         return
 
-    # Extrair DOIs do arquivo Y (já devem estar normalizados e em minúsculas pela padronização)
-    dois_y = set()
-    for entry in db_y.entries:
-        # Get the already normalized DOI
-        doi = entry.get('doi', '').strip() # Should be lowercase and just the ID
-        if doi:
-            dois_y.add(doi)
-    logging.info(f"Encontrados {len(dois_y)} DOIs únicos no arquivo Y ({file_y_path}) para comparação.")
+    logger.info(f"Encontrados {len(dois_y)} DOIs únicos no arquivo Y ({y_label}) para comparação.")
+
+    # Filtro de Bloom como pré-filtro para Y grande: um "não está" do filtro
+    # é garantido e dispensa a consulta ao conjunto exato. Positivos são
+    # confirmados em dois_y, então falsos positivos não descartam entradas.
+    bloom_y = None
+    if BloomFilter is not None and len(dois_y) >= _BLOOM_MIN_DOIS:
+        bloom_y = BloomFilter(capacity=len(dois_y) * 2, error_rate=0.0001)
+        for doi in dois_y:
+            bloom_y.add(doi)
+
+    # Com xxhash, o conjunto exato guarda digests de 64 bits em vez das
+    # strings. Colisão com 1e6 DOIs é ~1e-7 — desprezível para deduplicação.
+    if xxhash is not None:
+        dois_y = {_doi_key(doi) for doi in dois_y}
 
     # Filtrar entradas do arquivo X
-    unique_entries_x = []
     removed_count = 0
     processed_ids_x = set() # Avoid duplicate processing within file X itself
 
-    for entry in db_x.entries:
-        entry_id = entry.get('ID')
-        if entry_id in processed_ids_x:
-             logging.warning(f"ID de entrada duplicado '{entry_id}' encontrado durante a filtragem de {file_x_path}. Pulando ocorrência adicional.")
-             continue
-        processed_ids_x.add(entry_id)
-
-        # Get the already normalized DOI from file X entry
-        doi_x = entry.get('doi', '').strip() # Should be lowercase and just the ID
-
-        if not doi_x or doi_x not in dois_y:
-            unique_entries_x.append(entry)
-        else:
-            removed_count += 1
-            logging.info(f"Removendo entrada '{entry.get('ID')}' de X (DOI: {doi_x}) pois existe em Y.") # Changed to INFO for visibility
-
-    logging.info(f"Removidas {removed_count} entradas duplicadas de {file_x_path} com base nos DOIs de {file_y_path}.")
-
-    # Salvar resultado em novo arquivo BibTeX
-    final_db = BibDatabase()
-    final_db.entries = unique_entries_x
+    def unique_entries_x():
+        # Gerador: as entradas mantidas fluem direto para o arquivo de saída,
+        # sem lista intermediária — memória extra O(1) em vez de O(|mantidas|).
+        # A entrada X já vem ordenada por ID da padronização, então a ordem de
+        # escrita é preservada.
+        nonlocal removed_count
+        # Loop quente: métodos e globais presos em locais para eliminar o
+        # lookup de atributo e o despacho por entrada (o que uma extensão
+        # compilada removeria do overhead de interpretação).
+        seen_id = processed_ids_x.__contains__
+        mark_id = processed_ids_x.add
+        doi_in_y = dois_y.__contains__
+        doi_key = _doi_key
+        log_removals = logger.isEnabledFor(logging.INFO)
+        for entry in entries_x:
+            entry_id = entry.get('ID')
+            if seen_id(entry_id):
+                logger.warning("ID de entrada duplicado '%s' encontrado durante a filtragem de %s. Pulando ocorrência adicional.", entry_id, file_x_path)
+                continue
+            mark_id(entry_id)
+
+            # Get the already normalized DOI from file X entry
+            doi_x = entry.get('doi', '').strip() # Should be lowercase and just the ID
+
+            if not doi_x:
+                is_duplicate = False
+            elif bloom_y is not None and doi_x not in bloom_y:
+                is_duplicate = False # Negativo garantido pelo filtro de Bloom
+            else:
+                is_duplicate = doi_in_y(doi_key(doi_x))
+
+            if not is_duplicate:
+                yield entry
+            else:
+                removed_count += 1
+                # Formatação %s preguiçosa e guarda isEnabledFor: quando INFO
+                # não é emitido, nem a mensagem nem a chamada são pagas.
+                if log_removals:
+                    logger.info("Removendo entrada '%s' de X (DOI: %s) pois existe em Y.", entry_id, doi_x) # Changed to INFO for visibility
+
+    # Salvar resultado em novo arquivo BibTeX (filtragem e escrita em um passo)
     try:
-        writer = BibTexWriter()
-        writer.indent = '  '
-        writer.comma_first = False
-        with open(output_path, 'w', encoding='utf-8') as bibtex_outfile:
-            bibtex_outfile.write(writer.write(final_db))
-        logging.info(f"Arquivo BibTeX sem duplicatas salvo em: {output_path}")
+        _write_bib(unique_entries_x(), output_path, presorted=True)
+        logger.info(f"Removidas {removed_count} entradas duplicadas de {file_x_path} com base nos DOIs de {y_label}.")
+        logger.info(f"Arquivo BibTeX sem duplicatas salvo em: {output_path}")
     except Exception as e:
-        logging.error(f"Erro ao salvar o arquivo BibTeX resultante {output_path}: {e}")
+        logger.error(f"Erro ao salvar o arquivo BibTeX resultante {output_path}: {e}")
+
+# --- Função de Remoção de Duplicatas Acumulada ---
+def remove_duplicates_by_doi_multi(file_x_path, file_y_paths, output_path):
+    """
+    Variante acumulada: remove de X as entradas cujo DOI exista em QUALQUER
+    um dos arquivos de file_y_paths. Une os conjuntos de DOIs (via varredura
+    rápida memoizada) uma única vez e filtra X numa única passada, em vez de
+    uma remoção sequencial com um parse completo por arquivo Y.
+    """
+    dois_y = set()
+    for y_path in file_y_paths:
+        try:
+            dois_y |= _load_dois(y_path, os.path.getmtime(y_path))
+        except FileNotFoundError:
+            logger.error(f"Erro: Arquivo não encontrado em {y_path}. Abortando remoção de duplicatas.")
+            return
+        except Exception as e:
+            logger.error(f"Erro ao ler o arquivo BibTeX {y_path}: {e}. Abortando remoção de duplicatas.")
+            return
+    remove_duplicates_by_doi(file_x_path, dois_y, output_path)
 
 # --- Função de Conversão para CSV ---
 def convert_bibtex_to_csv(bibtex_path, csv_path):
     """
     Converte um arquivo BibTeX (padronizado) para CSV com colunas específicas.
     """
-    logging.info(f"Iniciando conversão de BibTeX para CSV: {bibtex_path} -> {csv_path}")
+    logger.info(f"Iniciando conversão de BibTeX para CSV: {bibtex_path} -> {csv_path}")
 
     try:
-        with open(bibtex_path, 'r', encoding='utf-8') as bibtex_file:
-            parser = BibTexParser(common_strings=True)
-            parser.ignore_nonstandard_types = False
-            parser.homogenize_fields = False # Already standardized
-            bib_database = bibtexparser.load(bibtex_file, parser=parser)
+        entries = _load_bib(bibtex_path)
     except FileNotFoundError:
-        logging.error(f"Erro: Arquivo BibTeX não encontrado em {bibtex_path}")
+        logger.error(f"Erro: Arquivo BibTeX não encontrado em {bibtex_path}")
         return
     except Exception as e:
-        logging.error(f"Erro ao ler o arquivo BibTeX {bibtex_path}: {e}")
+        logger.error(f"Erro ao ler o arquivo BibTeX {bibtex_path}: {e}")
         return
 
     # Definir cabeçalho do CSV
@@ -228,39 +484,49 @@ def convert_bibtex_to_csv(bibtex_path, csv_path):
                   'Review', 'author', 'year', 'Publisher', 'journal', 'type title']
 
     try:
-        with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-            # Use QUOTE_ALL for safety with complex fields like abstract/keywords
-            writer = csv.DictWriter(csvfile, fieldnames=csv_header, quoting=csv.QUOTE_ALL)
-            writer.writeheader()
-
-            for entry in bib_database.entries:
-                # Prepare row data using .get() for safety
-                row_data = {
-                    'ID': entry.get('ID', ''),
-                    'doi': entry.get('doi', ''), # Already normalized
-                    'classification': '', # Empty column as requested
-                    'title': entry.get('title', ''),
-                    'abstract': entry.get('abstract', ''),
-                    'keywords': entry.get('keywords', ''),
-                    'Review': '', # Empty column as requested
-                    'author': entry.get('author', ''),
-                    'year': entry.get('year', ''),
-                    'Publisher': entry.get('publisher', ''), # Note: BibTeX field is 'publisher' (lowercase)
-                    # Use 'journal' which might contain 'booktitle' from standardization
-                    'journal': entry.get('journal', ''), # Already handled in standardization
-                    'type title': entry.get('ENTRYTYPE', '').lower() # BibTeX entry type
-                }
-
-                # Clean potential problematic characters (like newlines) within fields for CSV
-                for key, value in row_data.items():
-                    if isinstance(value, str):
-                        # Replace newlines and carriage returns with spaces, strip leading/trailing whitespace
-                        row_data[key] = ' '.join(value.splitlines()).strip()
+        rows = []
+        for entry in entries:
+            # Prepare row data using .get() for safety
+            row_data = {
+                'ID': entry.get('ID', ''),
+                'doi': entry.get('doi', ''), # Already normalized
+                'classification': '', # Empty column as requested
+                'title': entry.get('title', ''),
+                'abstract': entry.get('abstract', ''),
+                'keywords': entry.get('keywords', ''),
+                'Review': '', # Empty column as requested
+                'author': entry.get('author', ''),
+                'year': entry.get('year', ''),
+                'Publisher': entry.get('publisher', ''), # Note: BibTeX field is 'publisher' (lowercase)
+                # Use 'journal' which might contain 'booktitle' from standardization
+                'journal': entry.get('journal', ''), # Already handled in standardization
+                'type title': entry.get('ENTRYTYPE', '').lower() # BibTeX entry type
+            }
 
-                writer.writerow(row_data)
-        logging.info(f"Arquivo CSV gerado com sucesso em: {csv_path}")
+            # Clean potential problematic characters (like newlines) within fields for CSV
+            for key, value in row_data.items():
+                if value and isinstance(value, str):
+                    # Replace newlines/tabs with spaces, strip leading/trailing whitespace
+                    row_data[key] = value.translate(_NL_TABLE).strip()
+
+            rows.append(row_data)
+
+        if pd is not None:
+            # Escrita em lote via pandas: o escaping roda em C, não em Python.
+            # lineterminator='\r\n' replica o terminador RFC-4180 do
+            # csv.DictWriter, mantendo os dois caminhos byte a byte idênticos.
+            pd.DataFrame(rows, columns=csv_header).to_csv(
+                csv_path, index=False, quoting=csv.QUOTE_ALL, encoding='utf-8',
+                lineterminator='\r\n')
+        else:
+            with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+                # Use QUOTE_ALL for safety with complex fields like abstract/keywords
+                writer = csv.DictWriter(csvfile, fieldnames=csv_header, quoting=csv.QUOTE_ALL)
+                writer.writeheader()
+                writer.writerows(rows)
+        logger.info(f"Arquivo CSV gerado com sucesso em: {csv_path}")
     except Exception as e:
-        logging.error(f"Erro ao escrever o arquivo CSV {csv_path}: {e}")
+        logger.error(f"Erro ao escrever o arquivo CSV {csv_path}: {e}")
 
 # --- Exemplo de Uso ---
 if __name__ == "__main__":
@@ -354,45 +620,54 @@ if __name__ == "__main__":
     # --- Execução do Fluxo ---
 
     # 1. Padronizar arquivos (inclui normalização de DOI)
-    logging.info("--- Iniciando Etapa 1: Padronização ---")
-    standardize_bibtex_file(ieee_input, ieee_standardized)
-    standardize_bibtex_file(scidirect_input, scidirect_standardized)
-    standardize_bibtex_file(mdpi_input, mdpi_standardized)
-
-    # 2. Remover duplicatas
-    # Exemplo: Remover de SciDirect (X) os DOIs presentes em IEEE (Y)
-    logging.info("\n--- Iniciando Etapa 2a: Remoção de Duplicatas (SciDirect vs IEEE) ---")
+    # As padronizações são independentes e dominadas pelo parser (CPU), então
+    # rodam em processos paralelos: o tempo cai para o máximo individual em
+    # vez da soma (o GIL torna threads inúteis aqui).
+    logger.info("--- Iniciando Etapa 1: Padronização (em paralelo) ---")
+    standardize_jobs = [
+        (ieee_input, ieee_standardized),
+        (scidirect_input, scidirect_standardized),
+        (mdpi_input, mdpi_standardized),
+    ]
+    with ProcessPoolExecutor(max_workers=len(standardize_jobs)) as executor:
+        list(executor.map(standardize_bibtex_file, *zip(*standardize_jobs)))
+
+    # 2. Remover duplicatas de forma acumulada
+    # Exemplo: Remover de SciDirect (X) os DOIs presentes em IEEE (Y); depois
+    # remover de MDPI (X) os DOIs presentes em IEEE *ou* no SciDirect único.
+    logger.info("\n--- Iniciando Etapa 2a: Remoção de Duplicatas (SciDirect vs IEEE) ---")
     file_x_scidirect = scidirect_standardized
     file_y_ieee = ieee_standardized
     processed_scidirect_unique_vs_ieee = "processed_bib/scidirect_unique_vs_ieee.bib"
     remove_duplicates_by_doi(file_x_scidirect, file_y_ieee, processed_scidirect_unique_vs_ieee)
 
-    # Exemplo: Remover de MDPI (X) os DOIs presentes em IEEE (Y)
-    # Numa aplicação real, você poderia querer comparar MDPI contra IEEE E SciDirect único.
-    # Para este exemplo, comparamos apenas contra IEEE.
-    logging.info("\n--- Iniciando Etapa 2b: Remoção de Duplicatas (MDPI vs IEEE) ---")
+    # A etapa 2b depende da saída da 2a (SciDirect único entra como Y),
+    # então roda em seguida, não em paralelo.
+    logger.info("\n--- Iniciando Etapa 2b: Remoção de Duplicatas (MDPI vs IEEE + SciDirect único) ---")
     file_x_mdpi = mdpi_standardized
-    # file_y_combined = # Logic to combine DOIs from ieee_standardized and processed_scidirect_unique_vs_ieee
     processed_mdpi_unique_vs_ieee = "processed_bib/mdpi_unique_vs_ieee.bib"
-    remove_duplicates_by_doi(file_x_mdpi, file_y_ieee, processed_mdpi_unique_vs_ieee) # Using file_y_ieee for simplicity here
+    remove_duplicates_by_doi_multi(
+        file_x_mdpi,
+        [file_y_ieee, processed_scidirect_unique_vs_ieee],
+        processed_mdpi_unique_vs_ieee)
 
-    # 3. Converter para CSV
-    # Exemplo: Converter o arquivo SciDirect único (após remoção vs IEEE) para CSV
-    logging.info("\n--- Iniciando Etapa 3a: Conversão para CSV (SciDirect Único vs IEEE) ---")
+    # 3. Converter para CSV os arquivos únicos (após remoção vs IEEE)
+    logger.info("\n--- Iniciando Etapa 3: Conversão para CSV (em paralelo) ---")
     csv_output_scidirect = "output_csv/scidirect_unique_vs_ieee.csv"
-    convert_bibtex_to_csv(processed_scidirect_unique_vs_ieee, csv_output_scidirect)
-
-    # Exemplo: Converter o arquivo MDPI único (após remoção vs IEEE) para CSV
-    logging.info("\n--- Iniciando Etapa 3b: Conversão para CSV (MDPI Único vs IEEE) ---")
     csv_output_mdpi = "output_csv/mdpi_unique_vs_ieee.csv"
-    convert_bibtex_to_csv(processed_mdpi_unique_vs_ieee, csv_output_mdpi)
+    convert_jobs = [
+        (processed_scidirect_unique_vs_ieee, csv_output_scidirect),
+        (processed_mdpi_unique_vs_ieee, csv_output_mdpi),
+    ]
+    with ProcessPoolExecutor(max_workers=len(convert_jobs)) as executor:
+        list(executor.map(convert_bibtex_to_csv, *zip(*convert_jobs)))
 
     # --- Conclusão ---
-    logging.info("\n--- Processamento Concluído ---")
-    logging.info(f"Verifique os arquivos padronizados em: standardized_bib/")
-    logging.info(f"Verifique os arquivos processados (sem duplicatas vs IEEE) em: processed_bib/")
-    logging.info(f"Verifique os arquivos CSV gerados em: output_csv/")
-    logging.info("NOTA: O fluxo remove duplicatas de SciDirect e MDPI comparando *separadamente* com IEEE.")
-    logging.info("Para remover duplicatas de forma acumulada (ex: remover de MDPI o que existe em IEEE *ou* SciDirect)," )
-    logging.info("você precisaria ajustar a Etapa 2 para carregar DOIs de múltiplos arquivos 'Y' ou processar sequencialmente.")
+    logger.info("\n--- Processamento Concluído ---")
+    logger.info(f"Verifique os arquivos padronizados em: standardized_bib/")
+    logger.info(f"Verifique os arquivos processados (sem duplicatas vs IEEE) em: processed_bib/")
+    logger.info(f"Verifique os arquivos CSV gerados em: output_csv/")
+    logger.info("NOTA: A remoção agora é acumulada: MDPI é comparado contra IEEE *e* SciDirect único,")
+    logger.info("via remove_duplicates_by_doi_multi, que une os DOIs de múltiplos arquivos 'Y' em um")
+    logger.info("único conjunto e filtra X numa única passada.")
 